@@ -0,0 +1,19 @@
+'''
+Django settings for running the test suite
+'''
+
+from app.settings import *  # noqa: F401,F403
+
+# Hash strength is irrelevant in tests; PBKDF2 dominates user setup time.
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+]
+
+# The suite only uses portable ORM features, so an in-memory database
+# avoids creating and migrating a PostgreSQL test database on every run.
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+}
@@ -86,6 +86,14 @@ class Ingredient(models.Model):
         return self.name
 
 
+class RecipeQuerySet(models.QuerySet):
+    '''QuerySet for recipes'''
+
+    def with_related(self):
+        '''Prefetch the tags and ingredients rendered with recipes'''
+        return self.prefetch_related('tags', 'ingredients')
+
+
 class Recipe(models.Model):
     '''Recipe object.'''
 
@@ -102,5 +110,12 @@ class Recipe(models.Model):
     ingredients = models.ManyToManyField('Ingredient')
     image = models.ImageField(null=True, upload_to=recipe_image_file_path)
 
+    objects = RecipeQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-id']),
+        ]
+
     def __str__(self):
         return self.title
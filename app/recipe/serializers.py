@@ -1,6 +1,8 @@
 '''
 Serializers for Recipe API
 '''
+import copy
+
 from rest_framework import serializers
 from core.models import Recipe, Tag, Ingredient
 
@@ -29,6 +31,8 @@ class RecipeSerializer(serializers.ModelSerializer):
     tags = TagSerializer(many=True, required=False)
     ingredients = IngredientSerializer(many=True, required=False)
 
+    _fields_cache = {}
+
     class Meta:
         model = Recipe
         fields = [
@@ -43,6 +47,14 @@ class RecipeSerializer(serializers.ModelSerializer):
 
         read_only_fields = ['id']
 
+    def get_fields(self):
+        '''Build the model fields once per class and copy them after'''
+        cls = type(self)
+        if cls not in self._fields_cache:
+            self._fields_cache[cls] = super().get_fields()
+
+        return copy.deepcopy(self._fields_cache[cls])
+
 
 class RecipeDetailSerializer(RecipeSerializer):
 
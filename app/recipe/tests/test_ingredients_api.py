@@ -19,7 +19,7 @@ INGREDIENTS_URL = reverse('recipe:ingredient-list')
 
 def details_url(ingredient_id):
     '''Create and return a ingredient detail url'''
-    return reverse('recipe:ingredient-detail', args=[ingredient_id])
+    return f'{INGREDIENTS_URL}{ingredient_id}/'
 
 
 def create_user(email='user@example.com', password="pass123456"):
@@ -32,8 +32,7 @@ def create_ingredient(email='user@example.com', name='Ingredient'):
 
 class PublicIngredientsAPITests(TestCase):
 
-    def setUp(self):
-        self.client = APIClient()
+    client_class = APIClient
 
     def test_auth_required(self):
         '''Test auth is required for retrieving tags'''
@@ -44,18 +43,23 @@ class PublicIngredientsAPITests(TestCase):
 
 class PrivateIngredientAPITests(TestCase):
 
-    def setUp(self):
-        self.client = APIClient()
-        self.user = create_user(
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user(
             email='joshua@example.com',
             password='123456qwerty'
         )
+
+    def setUp(self):
         self.client.force_authenticate(self.user)
 
     def test_retrieve_ingredients(self):
         '''Test retrieving a list of ingredients'''
 
-        res = self.client.get(INGREDIENTS_URL)
+        with self.assertNumQueries(1):
+            res = self.client.get(INGREDIENTS_URL)
 
         ingredients = Ingredient.objects.all().order_by('-name')
         serializer = IngredientSerializer(ingredients, many=True)
@@ -71,8 +75,10 @@ class PrivateIngredientAPITests(TestCase):
             password='123qwerty')
 
         ingredient = Ingredient.objects.create(user=self.user, name='Sauce')
-        Ingredient.objects.create(user=self.user, name='Cheese')
-        Ingredient.objects.create(user=other_user, name='Pepper')
+        Ingredient.objects.bulk_create([
+            Ingredient(user=self.user, name='Cheese'),
+            Ingredient(user=other_user, name='Pepper'),
+        ])
 
         res = self.client.get(INGREDIENTS_URL)
 
@@ -2,12 +2,14 @@
 Tests for Recipe API
 '''
 
-import tempfile
+import io
 import os
 from PIL import Image
 
 from decimal import Decimal
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
 from django.urls import reverse
 
@@ -19,43 +21,63 @@ from core.models import Recipe, Tag, Ingredient
 from recipe.serializers import RecipeSerializer, RecipeDetailSerializer
 
 RECIPES_URL = reverse('recipe:recipe-list')
+SAMPLE_PASSWORD_HASH = make_password('qwerty')
 
 
 def details_url(recipe_id):
     '''Create and return a recipe detail URL.'''
-    return reverse("recipe:recipe-detail", args=[recipe_id])
+    return f'{RECIPES_URL}{recipe_id}/'
 
 
 def image_upload_url(recipe_id):
     '''Create and return an image upload URL'''
-    return reverse('recipe:recipe-upload-image', args=[recipe_id])
+    return f'{RECIPES_URL}{recipe_id}/upload_image/'
 
 
-def create_recipe(user, **params):
+RECIPE_DEFAULTS = {
+    'title': 'Sample recipe title',
+    'time_minutes': 22,
+    'price': Decimal('5.25'),
+    'description': 'Sample description',
+    'link': 'http://example.com/recipe.pdf'
+}
+
 
-    defaults = {
-        'title': 'Sample recipe title',
-        'time_minutes': 22,
-        'price': Decimal('5.25'),
-        'description': 'Sample description',
-        'link': 'http://example.com/recipe.pdf'
-    }
+def create_recipe(user, **params):
+    '''Create and return a sample recipe'''
 
-    defaults.update(params)
+    defaults = {**RECIPE_DEFAULTS, **params}
 
     recipe = Recipe.objects.create(user=user, **defaults)
     return recipe
 
 
+def create_recipes(user, n, **params):
+    '''Create n sample recipes in a single query'''
+
+    defaults = {**RECIPE_DEFAULTS, **params}
+
+    Recipe.objects.bulk_create(
+        [Recipe(user=user, **defaults) for _ in range(n)]
+    )
+
+
 def create_user(**params):
     ''''Create and return a new user'''
     return get_user_model().objects.create_user(**params)
 
 
+def create_user_fast(email):
+    '''Create and return a user that shares a precomputed password hash'''
+    return get_user_model().objects.create(
+        email=email,
+        password=SAMPLE_PASSWORD_HASH,
+    )
+
+
 class PublicRecipeAPITests(TestCase):
 
-    def setUp(self):
-        self.client = APIClient()
+    client_class = APIClient
 
     def test_auth_required(self):
         '''Test auth is required to call API'''
@@ -67,52 +89,74 @@ class PublicRecipeAPITests(TestCase):
 
 class PrivateRecipeAPITests(TestCase):
 
-    def setUp(self):
-        self.client = APIClient()
-        self.user = create_user(
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user(
             email='john@test.com',
             password='qwerty'
         )
+
+    def setUp(self):
         self.client.force_authenticate(self.user)
 
     def test_retrieve_recipes(self):
         '''Test auth is required to call API'''
 
         create_recipe(user=self.user)
-        create_recipe(user=self.user)
+        recipe = create_recipe(user=self.user)
+        tag = Tag.objects.create(user=self.user, name='Dinner')
+        ingredient = Ingredient.objects.create(user=self.user, name='Rice')
+        recipe.tags.add(tag)
+        recipe.ingredients.add(ingredient)
 
-        res = self.client.get(RECIPES_URL)
+        with self.assertNumQueries(3):
+            res = self.client.get(RECIPES_URL)
 
-        recipes = Recipe.objects.all().order_by('-id')
-        serializer = RecipeSerializer(recipes, many=True)
+        recipe_ids = Recipe.objects.order_by('-id').values_list(
+            'id',
+            flat=True,
+        )
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual([r['id'] for r in res.data], list(recipe_ids))
+        self.assertEqual(
+            [r['title'] for r in res.data],
+            ['Sample recipe title', 'Sample recipe title'],
+        )
+        self.assertEqual(list(res.data[0]), RecipeSerializer.Meta.fields)
+        self.assertEqual(
+            res.data[0]['tags'],
+            [{'id': tag.id, 'name': tag.name}],
+        )
+        self.assertEqual(
+            res.data[0]['ingredients'],
+            [{'id': ingredient.id, 'name': ingredient.name}],
+        )
+        self.assertEqual(res.data[1]['tags'], [])
+        self.assertEqual(res.data[1]['ingredients'], [])
 
     def test_recipe_list_limited_to_user(self):
         '''Test auth is required to call API'''
 
-        other_user = create_user(
-            email='jane@pain.com',
-            password='qwerty'
-        )
-
-        create_recipe(user=self.user)
-        create_recipe(user=other_user)
+        other_user = create_user_fast(email='jane@pain.com')
 
-        res = self.client.get(RECIPES_URL)
+        recipe = create_recipe(user=self.user)
+        create_recipes(user=other_user, n=2)
 
-        recipes = Recipe.objects.filter(user=self.user)
-        serializer = RecipeSerializer(recipes, many=True)
+        with self.assertNumQueries(3):
+            res = self.client.get(RECIPES_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual([r['id'] for r in res.data], [recipe.id])
 
     def test_get_recipe_detail(self):
         '''Test get recipe detail'''
         recipe = create_recipe(user=self.user)
         url = details_url(recipe.id)
-        res = self.client.get(url)
+        with self.assertNumQueries(3):
+            res = self.client.get(url)
 
         serializer = RecipeDetailSerializer(recipe)
         self.assertEqual(res.data, serializer.data)
@@ -188,7 +232,7 @@ class PrivateRecipeAPITests(TestCase):
 
     def test_update_user_returns_error(self):
         '''Test changing the recipe user results in an error'''
-        new_user = create_user(email='123@example.com', password="1233456")
+        new_user = create_user_fast(email='123@example.com')
         recipe = create_recipe(user=self.user)
 
         payload = {'user': new_user.id}
@@ -211,10 +255,7 @@ class PrivateRecipeAPITests(TestCase):
     def test_delete_other_users_recipe_error(self):
         '''Test for deleting recipe.'''
 
-        new_user = create_user(
-            email="bob@example.com",
-            password="123456",
-            )
+        new_user = create_user_fast(email='bob@example.com')
 
         recipe = create_recipe(user=new_user)
         url = details_url(recipe.id)
@@ -240,18 +281,18 @@ class PrivateRecipeAPITests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
 
         recipes = Recipe.objects.filter(user=self.user)
-        recipe = recipes[0]
+        recipe = recipes.first()
 
-        self.assertEqual(len(recipes), 1)
+        self.assertEqual(recipes.count(), 1)
         self.assertEqual(recipe.tags.count(), 2)
 
-        for tag in payload['tags']:
-            exists = recipe.tags.filter(
-                name=tag['name'],
-                user=self.user
-                ).exists()
+        names = {tag['name'] for tag in payload['tags']}
+        found = set(recipe.tags.filter(
+            name__in=names,
+            user=self.user,
+        ).values_list('name', flat=True))
 
-            self.assertTrue(exists)
+        self.assertEqual(found, names)
 
     def test_create_recipe_with_existing_tags(self):
         '''Creating recipe with existing tags'''
@@ -357,17 +398,17 @@ class PrivateRecipeAPITests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
 
         recipes = Recipe.objects.filter(user=self.user)
-        recipe = recipes[0]
+        recipe = recipes.first()
         self.assertEqual(recipes.count(), 1)
         self.assertEqual(recipe.ingredients.count(), 2)
 
-        for ingredient in payload['ingredients']:
-            exists = recipe.ingredients.filter(
-                name=ingredient['name'],
-                user=self.user,
-            ).exists()
+        names = {ingredient['name'] for ingredient in payload['ingredients']}
+        found = set(recipe.ingredients.filter(
+            name__in=names,
+            user=self.user,
+        ).values_list('name', flat=True))
 
-            self.assertTrue(exists)
+        self.assertEqual(found, names)
 
     def test_create_recipe_with_existing_ingredient(self):
         '''Test creating a new recipe with existing ingredient'''
@@ -388,18 +429,19 @@ class PrivateRecipeAPITests(TestCase):
 
         ingredients = Ingredient.objects.filter(user=self.user)
         recipes = Recipe.objects.filter(user=self.user)
-        recipe = recipes[0]
+        recipe = recipes.first()
 
         self.assertEqual(ingredients.count(), 3)
         self.assertEqual(recipe.ingredients.count(), 2)
         self.assertIn(ingredient, recipe.ingredients.all())
 
-        for ingredient in payload['ingredients']:
-            exists = recipe.ingredients.filter(
-                name=ingredient['name'],
-                user=self.user
-                ).exists()
-            self.assertTrue(exists)
+        names = {ingredient['name'] for ingredient in payload['ingredients']}
+        found = set(recipe.ingredients.filter(
+            name__in=names,
+            user=self.user,
+        ).values_list('name', flat=True))
+
+        self.assertEqual(found, names)
 
     def test_create_ingredient_on_update(self):
         '''Test creating ingredient on update'''
@@ -422,14 +464,13 @@ class PrivateRecipeAPITests(TestCase):
 
         self.assertEqual(ingredients.count(), 2)
         recipe.refresh_from_db()
-        for ingredient in payload['ingredients']:
-
-            exists = recipe.ingredients.filter(
-                name=ingredient['name'],
-                user=self.user
-            ).exists()
+        names = {ingredient['name'] for ingredient in payload['ingredients']}
+        found = set(recipe.ingredients.filter(
+            name__in=names,
+            user=self.user,
+        ).values_list('name', flat=True))
 
-            self.assertTrue(exists)
+        self.assertEqual(found, names)
 
     def test_update_recipe_assign_ingredient(self):
         '''Test assigning an existing ingredient when updating a recipe'''
@@ -485,22 +526,21 @@ class PrivateRecipeAPITests(TestCase):
         t2 = Tag.objects.create(user=self.user, name="Vegetarian")
         t3 = Tag.objects.create(user=self.user, name="Spicy")
 
-        r1.tags.add(t1)
-        r1.tags.add(t3)
+        r1.tags.add(t1, t3)
         r2.tags.add(t1)
-        r3.tags.add(t2)
-        r3.tags.add(t3)
+        r3.tags.add(t2, t3)
 
         params = {'tags': f'{t2.id}'}
         res = self.client.get(RECIPES_URL, params)
 
-        s1 = RecipeSerializer(r1)
-        s2 = RecipeSerializer(r2)
-        s3 = RecipeSerializer(r3)
+        returned_ids = {recipe['id'] for recipe in res.data}
+        self.assertEqual(returned_ids, {r3.id})
 
-        self.assertNotIn(s1.data, res.data)
-        self.assertNotIn(s2.data, res.data)
-        self.assertIn(s3.data, res.data)
+        tags = sorted(res.data[0]['tags'], key=lambda tag: tag['id'])
+        self.assertEqual(tags, [
+            {'id': t2.id, 'name': t2.name},
+            {'id': t3.id, 'name': t3.name},
+        ])
 
     def test_filter_by_ingredients(self):
         '''Test filtering recipes by ingredients'''
@@ -518,30 +558,67 @@ class PrivateRecipeAPITests(TestCase):
 
         r1.ingredients.add(i1)
         r2.ingredients.add(i2)
-        r3.ingredients.add(i1)
-        r3.ingredients.add(i3)
+        r3.ingredients.add(i1, i3)
 
         params = {'ingredients': f'{i1.id}'}
         res = self.client.get(RECIPES_URL, params)
 
-        s1 = RecipeSerializer(r1)
-        s2 = RecipeSerializer(r2)
-        s3 = RecipeSerializer(r3)
+        returned_ids = {recipe['id'] for recipe in res.data}
+        self.assertEqual(returned_ids, {r1.id, r3.id})
+
+        row = next(recipe for recipe in res.data if recipe['id'] == r3.id)
+        ingredients = sorted(row['ingredients'], key=lambda i: i['id'])
+        self.assertEqual(ingredients, [
+            {'id': i1.id, 'name': i1.name},
+            {'id': i3.id, 'name': i3.name},
+        ])
+
+    def test_filtered_recipes_unique(self):
+        '''Test filtering by several tags returns each recipe once'''
+
+        r1 = create_recipe(user=self.user, title="Thai Vegetable Curry")
+        t1 = Tag.objects.create(user=self.user, name="Vegan")
+        t2 = Tag.objects.create(user=self.user, name="Spicy")
+        r1.tags.add(t1, t2)
+
+        params = {'tags': f'{t1.id},{t2.id}'}
+        res = self.client.get(RECIPES_URL, params)
+
+        self.assertEqual(len(res.data), 1)
+        self.assertEqual(res.data[0]['id'], r1.id)
+
+    def test_filter_ignores_invalid_ids(self):
+        '''Test non-numeric filter IDs are skipped instead of erroring'''
+
+        r1 = create_recipe(user=self.user, title="Thai Vegetable Curry")
+        create_recipe(user=self.user, title="Eggplant Parmesan")
+        tag = Tag.objects.create(user=self.user, name="Vegan")
+        r1.tags.add(tag)
+
+        params = {'tags': f'abc,{tag.id}'}
+        res = self.client.get(RECIPES_URL, params)
 
-        self.assertIn(s1.data, res.data)
-        self.assertNotIn(s2.data, res.data)
-        self.assertIn(s3.data, res.data)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([r['id'] for r in res.data], [r1.id])
 
 
 class ImageUploadTests(TestCase):
     '''Tests for the image upload API'''
 
-    def setUp(self):
-        self.client = APIClient()
-        self.user = get_user_model().objects.create_user(
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
             'josh@example.com',
             '123qwerty'
         )
+
+        image_buffer = io.BytesIO()
+        Image.new('RGB', (10, 10)).save(image_buffer, format='JPEG')
+        cls.image_bytes = image_buffer.getvalue()
+
+    def setUp(self):
         self.client.force_authenticate(self.user)
         self.recipe = create_recipe(user=self.user)
 
@@ -552,12 +629,13 @@ class ImageUploadTests(TestCase):
         '''Test uploading an image to a recipe'''
 
         url = image_upload_url(self.recipe.id)
-        with tempfile.NamedTemporaryFile(suffix='.jpg') as image_file:
-            img = Image.new('RGB', (10, 10))
-            img.save(image_file, format='JPEG')
-            image_file.seek(0)
-            payload = {'image': image_file}
-            res = self.client.post(url, payload, format='multipart')
+        image_file = SimpleUploadedFile(
+            'image.jpg',
+            self.image_bytes,
+            content_type='image/jpeg',
+        )
+        payload = {'image': image_file}
+        res = self.client.post(url, payload, format='multipart')
 
         self.recipe.refresh_from_db()
         self.assertEqual(res.status_code, status.HTTP_200_OK)
@@ -17,7 +17,7 @@ TAGS_URLS = reverse('recipe:tag-list')
 
 def details_url(tag_id):
     '''Create and return a tag detail url'''
-    return reverse('recipe:tag-detail', args=[tag_id])
+    return f'{TAGS_URLS}{tag_id}/'
 
 
 def create_user(email='user@example.com', password="pass123456"):
@@ -26,8 +26,7 @@ def create_user(email='user@example.com', password="pass123456"):
 
 class TagTests(TestCase):
 
-    def setUp(self):
-        self.client = APIClient()
+    client_class = APIClient
 
     def test_auth_required(self):
         '''Test auth is required for retrieving tags'''
@@ -38,9 +37,13 @@ class TagTests(TestCase):
 
 class PrivateTagsAPITest(TestCase):
 
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user()
+
     def setUp(self):
-        self.user = create_user()
-        self.client = APIClient()
         self.client.force_authenticate(self.user)
 
     def test_retrieve_tags(self):
@@ -49,13 +52,14 @@ class PrivateTagsAPITest(TestCase):
         Tag.objects.create(user=self.user, name="Cooking")
         Tag.objects.create(user=self.user, name="Baking")
 
-        res = self.client.get(TAGS_URLS)
-
-        tags = Tag.objects.all().order_by('-name')
-        serializer = TagSerializer(tags, many=True)
+        with self.assertNumQueries(1):
+            res = self.client.get(TAGS_URLS)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(
+            [tag['name'] for tag in res.data],
+            ['Cooking', 'Baking'],
+        )
 
     def test_tags_limited_to_user(self):
         '''Test lsit of tags is limited to that user'''
@@ -53,25 +53,47 @@ class RecipeViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
 
     def _params_to_ints(self, qs):
-        '''Convert a list of strings to integers'''
-        return [int(str_id) for str_id in qs.split(',')]
+        '''Convert a list of strings to integers, skipping invalid IDs'''
+        return [
+            int(str_id)
+            for str_id in qs.split(',')
+            if str_id.strip().isdecimal()
+        ]
 
     def get_queryset(self):
         tags = self.request.query_params.get('tags')
         ingredients = self.request.query_params.get('ingredients')
-        queryset = self.queryset
+        queryset = self.queryset.filter(user=self.request.user)
 
+        # Filter through pk subqueries so the M2M joins can't duplicate
+        # rows, which avoids a DISTINCT over the whole result set.
         if tags:
             tag_ids = self._params_to_ints(tags)
-            queryset = queryset.filter(tags__id__in=tag_ids)
+            queryset = queryset.filter(pk__in=Recipe.objects.filter(
+                tags__id__in=tag_ids
+            ).values('pk'))
 
         if ingredients:
             ingredient_ids = self._params_to_ints(ingredients)
-            queryset = queryset.filter(ingredients__id__in=ingredient_ids)
+            queryset = queryset.filter(pk__in=Recipe.objects.filter(
+                ingredients__id__in=ingredient_ids
+            ).values('pk'))
 
-        return queryset.filter(
-            user=self.request.user
-        ).order_by('-id').distinct()
+        queryset = queryset.order_by('-id')
+
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.with_related()
+
+        if self.action == 'list':
+            queryset = queryset.only(
+                'id',
+                'title',
+                'time_minutes',
+                'price',
+                'link',
+            )
+
+        return queryset
 
     def get_serializer_class(self):
         '''Return the serializer for request'''